@@ -6,6 +6,23 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    """
+    Read a boolean environment variable
+    
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset or empty
+        
+    Returns:
+        True for 1/true/yes/on (case-insensitive), False for anything else
+    """
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
 @dataclass
 class AgentConfig:
     """Configuration for SLM Agent with validation"""
@@ -19,6 +36,10 @@ class AgentConfig:
     slm_model: str = field(default_factory=lambda: os.getenv("SLM_MODEL", "deepseek"))
     slm_max_length: int = field(default_factory=lambda: int(os.getenv("SLM_MAX_LENGTH", "8192")))
     slm_timeout: int = field(default_factory=lambda: int(os.getenv("SLM_TIMEOUT", "300")))
+    slm_temperature: float = field(default_factory=lambda: float(os.getenv("SLM_TEMPERATURE", "0.7")))
+    slm_cache_dir: Optional[str] = field(default_factory=lambda: os.getenv("SLM_CACHE_DIR") or None)
+    slm_stop_at_endmodule: bool = field(default_factory=lambda: _env_flag("SLM_STOP_AT_ENDMODULE", False))  # Close plain-text responses after the first endmodule
+    slm_prefix_cache_hints: bool = field(default_factory=lambda: _env_flag("SLM_PREFIX_CACHE_HINTS", False))
     
     # Prompt engineering settings
     use_few_shot_examples: bool = True
@@ -31,15 +52,28 @@ class AgentConfig:
     
     # Logging
     log_file: str = '/code/rundir/agent_detailed.log'
+    verbose_logging: bool = field(default_factory=lambda: _env_flag("SLM_VERBOSE_LOGGING", True))  # Print full prompts, responses and extracted code
     
     def validate(self) -> None:
-        """Validate configuration values"""
-        assert self.max_iterations > 0, "max_iterations must be positive"
-        assert self.slm_timeout > 0, "slm_timeout must be positive"
-        assert self.slm_max_length >= 1024, "slm_max_length too small (min: 1024)"
-        assert self.test_timeout > 0, "test_timeout must be positive"
-        assert self.lint_timeout > 0, "lint_timeout must be positive"
-        assert self.max_context_files > 0, "max_context_files must be positive"
+        """
+        Validate configuration values
+        
+        Raises:
+            ValueError: If any setting is out of range
+        """
+        # Explicit raises (not asserts) so validation still runs under python -O
+        checks = (
+            (self.max_iterations > 0, "max_iterations must be positive"),
+            (self.slm_timeout > 0, "slm_timeout must be positive"),
+            (self.slm_max_length >= 1024, "slm_max_length too small (min: 1024)"),
+            (0.0 <= self.slm_temperature <= 1.0, "slm_temperature must be between 0.0 and 1.0"),
+            (self.test_timeout > 0, "test_timeout must be positive"),
+            (self.lint_timeout > 0, "lint_timeout must be positive"),
+            (self.max_context_files > 0, "max_context_files must be positive"),
+        )
+        for ok, message in checks:
+            if not ok:
+                raise ValueError(message)
     
     def __post_init__(self):
         """Validate on initialization"""
@@ -54,7 +54,9 @@ class IterativeRefinementAgent:
             api_url=self.config.slm_api_url,
             model=self.config.slm_model,
             max_length=self.config.slm_max_length,
-            timeout=self.config.slm_timeout
+            timeout=self.config.slm_timeout,
+            cache_dir=self.config.slm_cache_dir,
+            prefix_cache_hints=self.config.slm_prefix_cache_hints
         )
         
         self.response_parser = ResponseParser()
@@ -85,7 +87,10 @@ class IterativeRefinementAgent:
             port_analyzer=self.port_analyzer,
             test_runner=self.test_runner,
             max_iterations=self.config.max_iterations,
-            enable_port_validation=self.config.enable_port_validation
+            enable_port_validation=self.config.enable_port_validation,
+            verbose=self.config.verbose_logging,
+            stop_at_endmodule=self.config.slm_stop_at_endmodule,
+            temperature=self.config.slm_temperature
         )
     
     def run(self) -> int:
@@ -138,6 +143,13 @@ class IterativeRefinementAgent:
                 if final_code:
                     logger.info(f"Best attempt written to: {target_file}")
             
+            # Only report when the cache was consulted (temperature <= CACHE_MAX_TEMPERATURE)
+            if self.llm_client.cache_hits or self.llm_client.cache_misses:
+                logger.info(
+                    f"SLM response cache: {self.llm_client.cache_hits} hits, "
+                    f"{self.llm_client.cache_misses} misses"
+                )
+            
             # Always return 0 for benchmark compatibility
             return 0
             
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Iterative refinement loop with port usage validation"""
 
+import hashlib
 import logging
 import time
 from typing import Tuple, Optional, Dict
@@ -8,6 +9,9 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Separator line for log banners and debug output
+_BANNER = "=" * 80
+
 
 class RefinementLoop:
     """Manage iterative code refinement with validation"""
@@ -21,7 +25,10 @@ class RefinementLoop:
         port_analyzer,
         test_runner,
         max_iterations: int,
-        enable_port_validation: bool
+        enable_port_validation: bool,
+        verbose: bool = True,
+        stop_at_endmodule: bool = False,
+        temperature: float = 0.7
     ):
         """
         Initialize refinement loop
@@ -35,6 +42,9 @@ class RefinementLoop:
             test_runner: Test runner
             max_iterations: Maximum refinement iterations
             enable_port_validation: Enable port usage validation
+            verbose: Print full prompts, responses and extracted code
+            stop_at_endmodule: Stop reading SLM responses after the first 'endmodule'
+            temperature: Sampling temperature for SLM requests
         """
         self.llm_client = llm_client
         self.prompt_builder = prompt_builder
@@ -44,10 +54,16 @@ class RefinementLoop:
         self.test_runner = test_runner
         self.max_iterations = max_iterations
         self.enable_port_validation = enable_port_validation
+        self.verbose = verbose
+        self.stop_at_endmodule = stop_at_endmodule
+        self.temperature = temperature
         
         self.iteration = 0
         self.code = None
         self.errors = None
+        
+        # Test results by code digest, so identical regenerated code is not re-tested
+        self._test_results: Dict[bytes, Tuple[bool, str]] = {}
     
     def run(self, task: str, context: Dict[str, str], target_file: Path) -> Tuple[bool, Optional[str]]:
         """
@@ -62,9 +78,9 @@ class RefinementLoop:
             Tuple of (success, final_code)
         """
         for self.iteration in range(1, self.max_iterations + 1):
-            logger.info("=" * 80)
+            logger.info(_BANNER)
             logger.info(f"ITERATION {self.iteration}/{self.max_iterations}")
-            logger.info("=" * 80)
+            logger.info(_BANNER)
             
             # Build appropriate prompt
             if self.iteration == 1:
@@ -76,15 +92,16 @@ class RefinementLoop:
                 )
             
             # Print prompt for debugging
-            print("\n" + "=" * 80)
-            print(f"PROMPT SENT TO SLM (Iteration {self.iteration}):")
-            print("=" * 80)
-            #print(prompt[:2000] + "..." if len(prompt) > 2000 else prompt)
-            print(prompt)
-            print("=" * 80 + "\n")
+            self._print_block(f"PROMPT SENT TO SLM (Iteration {self.iteration}):", prompt.text)
             
             # Generate code
-            response = self.llm_client.generate(prompt)
+            response = self.llm_client.generate(
+                prompt.text,
+                temperature=self.temperature,
+                cache_prefix=prompt.prefix,
+                stop_at_endmodule=self.stop_at_endmodule,
+                repeat_key=prompt.repeat_key
+            )
             if not response:
                 logger.error("LLM generation failed")
                 if self.code:  # Keep previous code
@@ -94,12 +111,7 @@ class RefinementLoop:
                     return False, None
             
             # Print response for debugging
-            print("\n" + "=" * 80)
-            print(f"RESPONSE FROM SLM (Iteration {self.iteration}):")
-            print("=" * 80)
-            #print(response[:2000] + "..." if len(response) > 2000 else response)
-            print(response)
-            print("=" * 80 + "\n")
+            self._print_block(f"RESPONSE FROM SLM (Iteration {self.iteration}):", response)
             
             # Extract and validate code
             self.code = self.response_parser.extract_verilog(response)
@@ -110,11 +122,7 @@ class RefinementLoop:
                 continue
             
             # Print extracted code
-            print("\n" + "=" * 80)
-            print(f"EXTRACTED CODE (Iteration {self.iteration}):")
-            print("=" * 80)
-            print(self.code)
-            print("=" * 80 + "\n")
+            self._print_block(f"EXTRACTED CODE (Iteration {self.iteration}):", self.code)
             
             # Write code
             if not self.code_manager.write_code(target_file, self.code):
@@ -123,7 +131,7 @@ class RefinementLoop:
             
             # Run tests
             logger.info("Running tests...")
-            test_success, self.errors = self.test_runner.run()
+            test_success, self.errors = self._run_tests(self.code)
             
             if test_success:
                 # Tests passed! Now check port usage if enabled
@@ -143,15 +151,18 @@ class RefinementLoop:
                         )
                         
                         # Print port usage prompt
-                        print("\n" + "=" * 80)
-                        print(f"PORT USAGE REFINEMENT PROMPT (Iteration {self.iteration}):")
-                        print("=" * 80)
-                        #print(port_prompt[:2000] + "..." if len(port_prompt) > 2000 else port_prompt)
-                        print(prompt)
-                        print("=" * 80 + "\n")
+                        self._print_block(
+                            f"PORT USAGE REFINEMENT PROMPT (Iteration {self.iteration}):", port_prompt.text
+                        )
                         
                         # Generate refined code with port usage
-                        port_response = self.llm_client.generate(port_prompt)
+                        port_response = self.llm_client.generate(
+                            port_prompt.text,
+                            temperature=self.temperature,
+                            cache_prefix=port_prompt.prefix,
+                            stop_at_endmodule=self.stop_at_endmodule,
+                            repeat_key=port_prompt.repeat_key
+                        )
                         
                         if port_response:
                             refined_code = self.response_parser.extract_verilog(port_response)
@@ -160,65 +171,106 @@ class RefinementLoop:
                             self.code_manager.write_code(target_file, refined_code)
                             
                             # Re-run tests
-                            retest_success, retest_errors = self.test_runner.run()
+                            retest_success, retest_errors = self._run_tests(refined_code)
                             
                             if retest_success:
                                 # Check ports again
                                 port_recheck = self.port_analyzer.analyze(refined_code)
                                 
                                 if port_recheck["all_ports_used"]:
-                                    logger.info("=" * 80)
+                                    logger.info(_BANNER)
                                     logger.info(f"SUCCESS ON ITERATION {self.iteration} (after port refinement)!")
-                                    logger.info("=" * 80)
+                                    logger.info(_BANNER)
                                     return True, refined_code
                                 else:
                                     logger.warning("Ports still incomplete, but accepting compilable code")
                                     self.code = refined_code
-                                    logger.info("=" * 80)
+                                    logger.info(_BANNER)
                                     logger.info(f"SUCCESS ON ITERATION {self.iteration}!")
-                                    logger.info("=" * 80)
+                                    logger.info(_BANNER)
                                     return True, refined_code
                             else:
                                 logger.warning("Port refinement broke compilation, reverting")
                                 self.code_manager.write_code(target_file, self.code)
                                 # Accept original compilable code
-                                logger.info("=" * 80)
+                                logger.info(_BANNER)
                                 logger.info(f"SUCCESS ON ITERATION {self.iteration} (without port refinement)!")
-                                logger.info("=" * 80)
+                                logger.info(_BANNER)
                                 return True, self.code
                         else:
                             # Port refinement failed, accept compilable code
                             logger.warning("Port refinement generation failed, accepting compilable code")
-                            logger.info("=" * 80)
+                            logger.info(_BANNER)
                             logger.info(f"SUCCESS ON ITERATION {self.iteration}!")
-                            logger.info("=" * 80)
+                            logger.info(_BANNER)
                             return True, self.code
                     else:
                         # All ports used!
-                        logger.info("=" * 80)
+                        logger.info(_BANNER)
                         logger.info(f"SUCCESS ON ITERATION {self.iteration}!")
-                        logger.info("=" * 80)
+                        logger.info(_BANNER)
                         return True, self.code
                 else:
                     # Port validation disabled
-                    logger.info("=" * 80)
+                    logger.info(_BANNER)
                     logger.info(f"SUCCESS ON ITERATION {self.iteration}!")
-                    logger.info("=" * 80)
+                    logger.info(_BANNER)
                     return True, self.code
             else:
                 # Tests failed
-                logger.warning("=" * 80)
+                logger.warning(_BANNER)
                 logger.warning(f"TESTS FAILED ON ITERATION {self.iteration}")
-                logger.warning("=" * 80)
+                logger.warning(_BANNER)
                 logger.warning(f"Errors (first 500 chars):\n{self.errors[:500]}")
                 
                 # Small delay before next iteration
                 time.sleep(2)
         
         # Max iterations reached
-        logger.warning("=" * 80)
+        logger.warning(_BANNER)
         logger.warning(f"MAX ITERATIONS ({self.max_iterations}) REACHED")
-        logger.warning("=" * 80)
+        logger.warning(_BANNER)
         logger.warning("Tests did not pass, but exiting cleanly")
         
         return False, self.code
+    
+    def _run_tests(self, code: str) -> Tuple[bool, str]:
+        """
+        Run tests on code already written to the target file
+        
+        The SLM can return the same module again (e.g. after a failed fix),
+        so results are memoized on a digest of the code and the lint or
+        simulation run is skipped for code that was already tested.
+        
+        Args:
+            code: Code that was written to the target file
+            
+        Returns:
+            Tuple of (success, error_messages)
+        """
+        digest = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        cached = self._test_results.get(digest)
+        if cached is not None:
+            logger.info("Code identical to a previously tested version, reusing test result")
+            return cached
+        
+        result = self.test_runner.run()
+        self._test_results[digest] = result
+        return result
+    
+    def _print_block(self, title: str, text: str) -> None:
+        """
+        Print a titled debug block when verbose output is enabled
+        
+        Args:
+            title: Block heading
+            text: Prompt, response or code to print
+        """
+        if not self.verbose:
+            return
+        
+        print("\n" + _BANNER)
+        print(title)
+        print(_BANNER)
+        print(text)
+        print(_BANNER + "\n")
@@ -2,9 +2,10 @@
 """Manage Verilog code files and context gathering"""
 
 import json
+import hashlib
 import logging
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +13,11 @@ logger = logging.getLogger(__name__)
 class CodeManager:
     """Manage HDL code files and context"""
     
+    def __init__(self):
+        """Initialize code manager"""
+        # Last write per path: (code digest, mtime_ns, size), to skip identical rewrites
+        self._written: Dict[Path, Tuple[bytes, int, int]] = {}
+    
     def read_prompt(self, prompt_file: str = "/code/prompt.json") -> str:
         """
         Read task from prompt.json
@@ -134,6 +140,16 @@ class CodeManager:
             True if successful
         """
         try:
+            # Skip the write if the file still holds exactly what we last wrote
+            digest = hashlib.blake2b(code.encode(), digest_size=16).digest()
+            try:
+                stat = file_path.stat()
+                if self._written.get(file_path) == (digest, stat.st_mtime_ns, stat.st_size):
+                    logger.info(f"{file_path} already up to date, skipping write")
+                    return True
+            except FileNotFoundError:
+                pass
+            
             # Ensure parent directory exists
             file_path.parent.mkdir(parents=True, exist_ok=True)
             
@@ -141,6 +157,9 @@ class CodeManager:
             with open(file_path, "w") as f:
                 f.write(code)
             
+            stat = file_path.stat()
+            self._written[file_path] = (digest, stat.st_mtime_ns, stat.st_size)
+            
             logger.info(f"Wrote {len(code)} bytes to {file_path}")
             return True
             
@@ -3,10 +3,23 @@
 
 import re
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List
 
 logger = logging.getLogger(__name__)
 
+# Port declaration patterns: input/output [logic/wire/reg] [width] name
+_INPUT_PATTERNS = (
+    re.compile(r'input\s+(?:logic|wire|reg)?\s*(?:\[[^\]]+\])?\s+(\w+)'),
+    re.compile(r'input\s+(\w+)'),
+)
+_OUTPUT_PATTERNS = (
+    re.compile(r'output\s+(?:logic|wire|reg)?\s*(?:\[[^\]]+\])?\s+(\w+)'),
+    re.compile(r'output\s+(\w+)'),
+)
+
+# Words the declaration patterns can capture that are not port names
+_PORT_KEYWORDS = frozenset({'input', 'output', 'logic', 'wire', 'reg', 'signed', 'unsigned'})
+
 
 class PortAnalyzer:
     """Analyze Verilog module for port usage completeness"""
@@ -91,42 +104,23 @@ class PortAnalyzer:
     
     def _extract_inputs(self, code: str) -> List[str]:
         """Extract input port names from module"""
-        inputs = []
-        
-        # Pattern: input [logic/wire/reg] [width] name [, name]
-        patterns = [
-            r'input\s+(?:logic|wire|reg)?\s*(?:\[[^\]]+\])?\s+(\w+)',
-            r'input\s+(\w+)',
-        ]
+        inputs = set()
         
-        for pattern in patterns:
-            matches = re.findall(pattern, code, re.MULTILINE)
-            inputs.extend(matches)
+        for pattern in _INPUT_PATTERNS:
+            inputs.update(pattern.findall(code))
         
-        # Remove duplicates and filter out keywords
-        keywords = {'input', 'output', 'logic', 'wire', 'reg', 'signed', 'unsigned'}
-        inputs = [inp for inp in set(inputs) if inp not in keywords]
-        
-        return sorted(inputs)
+        # Filter out keywords (duplicates already removed by the set)
+        return sorted(inputs - _PORT_KEYWORDS)
     
     def _extract_outputs(self, code: str) -> List[str]:
         """Extract output port names from module"""
-        outputs = []
-        
-        patterns = [
-            r'output\s+(?:logic|wire|reg)?\s*(?:\[[^\]]+\])?\s+(\w+)',
-            r'output\s+(\w+)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, code, re.MULTILINE)
-            outputs.extend(matches)
+        outputs = set()
         
-        # Remove duplicates and filter out keywords
-        keywords = {'input', 'output', 'logic', 'wire', 'reg', 'signed', 'unsigned'}
-        outputs = [out for out in set(outputs) if out not in keywords]
+        for pattern in _OUTPUT_PATTERNS:
+            outputs.update(pattern.findall(code))
         
-        return sorted(outputs)
+        # Filter out keywords (duplicates already removed by the set)
+        return sorted(outputs - _PORT_KEYWORDS)
     
     def _extract_module_body(self, code: str) -> str:
         """
@@ -139,14 +133,14 @@ class PortAnalyzer:
             Module body without interface
         """
         # Find the end of port list (after closing parenthesis and semicolon)
-        match = re.search(r'\);', code)
-        if match:
-            return code[match.end():]
+        end = code.find(');')
+        if end != -1:
+            return code[end + 2:]
         
         # Fallback: return everything after first semicolon
-        match = re.search(r';', code)
-        if match:
-            return code[match.end():]
+        end = code.find(';')
+        if end != -1:
+            return code[end + 1:]
         
         return code
     
@@ -176,18 +170,11 @@ class PortAnalyzer:
         Returns:
             True if port has assignment
         """
-        # Look for assignments to port
-        patterns = [
-            r'\b' + re.escape(port_name) + r'\s*<=',   # Non-blocking
-            r'\b' + re.escape(port_name) + r'\s*=',    # Blocking
-            r'assign\s+' + re.escape(port_name),       # Continuous assignment
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, body):
-                return True
-        
-        return False
+        # Look for assignments to port in a single scan:
+        # non-blocking (<=) or blocking (=), or continuous assignment
+        name = re.escape(port_name)
+        pattern = r'\b' + name + r'\s*<?=|assign\s+' + name
+        return re.search(pattern, body) is not None
     
     def _generate_feedback(
         self,
@@ -1,17 +1,88 @@
 #!/usr/bin/env python3
 """SLM API client for code generation"""
 
-import requests
+import io
+import json
+import socket
+import hashlib
 import logging
-from typing import Optional, Dict
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Responses are only cached for near-deterministic sampling; higher
+# temperatures bypass the cache to preserve sampling diversity
+CACHE_MAX_TEMPERATURE = 0.3
+
+# Response cache entries kept on disk; the least recently used (by file mtime,
+# refreshed on every hit) are pruned beyond this
+CACHE_MAX_ENTRIES = 256
+
+# Chunk size used when streaming the response body
+STREAM_CHUNK_SIZE = 4096
+
+# TCP keep-alive timings (seconds) so the pooled connection survives the
+# pauses between SLM calls while prompts are built and tests run
+TCP_KEEPIDLE_SECONDS = 30
+TCP_KEEPINTVL_SECONDS = 10
+
+# Repeated prompts within this window are re-sampled at a higher temperature
+# so the refinement loop does not oscillate on identical requests
+RECENT_PROMPT_WINDOW = 16
+REPEAT_TEMPERATURE_BUMP = 0.2
+MAX_TEMPERATURE = 1.0
+
+# Response fields different SLM APIs use for the generated text, in lookup order
+RESPONSE_FIELDS = ('generated_text', 'text', 'response', 'output', 'result')
+
+
+def _create_session():
+    """
+    Create an HTTP session with a small keep-alive connection pool
+    
+    All calls go to the same SLM endpoint, so one pooled connection is
+    reused instead of opening a new TCP connection per request.
+    
+    Returns:
+        Configured requests.Session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection
+    
+    socket_options = list(HTTPConnection.default_socket_options)  # Includes TCP_NODELAY
+    socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):  # Linux-only options
+        socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, TCP_KEEPIDLE_SECONDS))
+        socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, TCP_KEEPINTVL_SECONDS))
+    
+    class KeepAliveAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs["socket_options"] = socket_options
+            super().init_poolmanager(*args, **kwargs)
+    
+    adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=4, pool_block=False)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
 
 class SLMAPIClient:
     """Interface to Small Language Model API"""
     
-    def __init__(self, api_url: str, model: str, max_length: int, timeout: int):
+    def __init__(
+        self,
+        api_url: str,
+        model: str,
+        max_length: int,
+        timeout: int,
+        cache_dir: Optional[str] = None,
+        prefix_cache_hints: bool = False
+    ):
         """
         Initialize SLM API client
         
@@ -20,28 +91,87 @@ class SLMAPIClient:
             model: Model name/identifier
             max_length: Maximum generation length
             timeout: Request timeout in seconds
+            cache_dir: Directory for on-disk response cache (disabled if None)
+            prefix_cache_hints: Send cache_prefix/prefix_length fields and an
+                X-Prompt-Cache-Key header (only for servers that accept them)
         """
         self.api_url = api_url
         self.model = model
         self.max_length = max_length
         self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.prefix_cache_hints = prefix_cache_hints
+        self._session = None  # Created on first generate()
+        self._recent_prompts = OrderedDict()  # blake2b digest -> None, LRU order
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        if self.cache_dir:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            except Exception as e:
+                logger.warning(f"Could not create response cache dir {cache_dir}: {e}")
+                self.cache_dir = None
         
         logger.info(f"Initialized SLM API Client")
         logger.info(f"  URL: {api_url}")
         logger.info(f"  Model: {model}")
         logger.info(f"  Max length: {max_length}")
+        logger.info(f"  Response cache: {self.cache_dir or 'disabled'}")
+        logger.info(f"  Prefix cache hints: {prefix_cache_hints}")
     
-    def generate(self, prompt: str, temperature: float = 0.7) -> Optional[str]:
+    def generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        cache_prefix: Optional[str] = None,
+        stop_at_endmodule: bool = False,
+        repeat_key: Optional[str] = None
+    ) -> Optional[str]:
         """
         Generate code using SLM API
         
         Args:
             prompt: Input prompt with TASK, REQUIREMENTS, etc.
             temperature: Sampling temperature (0.0-1.0)
+            cache_prefix: Static leading part of prompt (sent as a hint only when
+                prefix_cache_hints is enabled)
+            stop_at_endmodule: Close a plain-text stream once 'endmodule' arrives
+            repeat_key: Prompt content used to detect repeats, without markers that
+                change on every call (defaults to prompt)
             
         Returns:
             Generated text or None on failure
         """
+        # Deferred so importing the client does not pull in requests/urllib3
+        import requests
+        
+        if repeat_key is None:
+            repeat_key = prompt
+        prompt_digest = hashlib.blake2b(repeat_key.encode(), digest_size=16).digest()
+        
+        # Look up the exact request first: repeating a prompt that was answered
+        # at a cacheable temperature replays that answer instead of bumping. The
+        # cache is keyed on the full prompt, so a refinement whose only change is
+        # the iteration number misses here and gets bumped below
+        cache_key = None
+        if self.cache_dir and temperature <= CACHE_MAX_TEMPERATURE:
+            cache_key = self._cache_key(prompt, temperature, stop_at_endmodule)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.cache_hits += 1
+                logger.info(f"SLM response cache hit: {len(cached)} bytes")
+                self._remember_prompt(prompt_digest)
+                return cached
+            self.cache_misses += 1
+        
+        # A bumped request is meant to diverge, so it neither reads nor fills the cache
+        if prompt_digest in self._recent_prompts:
+            bumped = round(min(temperature + REPEAT_TEMPERATURE_BUMP, MAX_TEMPERATURE), 2)
+            logger.warning(f"Prompt repeated, raising temperature {temperature} -> {bumped} to force divergence")
+            temperature = bumped
+            cache_key = None
+        
         try:
             payload = {
                 "prompt": prompt,
@@ -49,35 +179,64 @@ class SLMAPIClient:
                 "model": self.model,
                 "temperature": temperature
             }
+            headers = {"Content-Type": "application/json"}
+            
+            # Mark the static prefix for servers whose prefix (KV) cache takes explicit
+            # hints; servers that cache prefixes automatically need nothing extra
+            if self.prefix_cache_hints and cache_prefix and prompt.startswith(cache_prefix):
+                payload["cache_prefix"] = True
+                payload["prefix_length"] = len(cache_prefix)
+                headers["X-Prompt-Cache-Key"] = hashlib.blake2b(
+                    cache_prefix.encode(), digest_size=16
+                ).hexdigest()
             
             logger.info(f"Calling SLM API: {self.api_url}/generate")
             logger.info(f"  Model: {self.model}, Temperature: {temperature}")
             logger.info(f"  Prompt length: {len(prompt)} chars")
             
-            response = requests.post(
+            if self._session is None:
+                self._session = _create_session()
+            
+            with self._session.post(
                 f"{self.api_url}/generate",
-                headers={"Content-Type": "application/json"},
+                headers=headers,
                 json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Try multiple field names that different SLM APIs might use
-                for field in ['generated_text', 'text', 'response', 'output', 'result']:
-                    if field in data:
-                        result = data[field]
-                        logger.info(f"Received {len(result)} bytes from SLM (field: {field})")
-                        return result
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.error(f"SLM API error {response.status_code}: {response.text}")
+                    return None
                 
-                # Fallback: return whole response as string
-                result = str(data)
-                logger.warning(f"Unknown response format, returning as string: {len(result)} bytes")
+                # A partial JSON document is useless, so only plain-text streams may stop early
+                is_json = "json" in response.headers.get("Content-Type", "")
+                body = self._read_stream(response, stop_at_endmodule and not is_json)
+            
+            try:
+                data = json.loads(body)
+            except ValueError:
+                # Plain-text response body
+                logger.info(f"Received {len(body)} bytes of plain text from SLM")
+                self._remember_prompt(prompt_digest)
+                if cache_key and body:
+                    self._cache_put(cache_key, body)
+                return body
+            
+            # Try multiple field names that different SLM APIs might use
+            field = next((f for f in RESPONSE_FIELDS if f in data), None)
+            if field is not None:
+                result = data[field]
+                logger.info(f"Received {len(result)} bytes from SLM (field: {field})")
+                self._remember_prompt(prompt_digest)
+                if cache_key and result:
+                    self._cache_put(cache_key, result)
                 return result
-            else:
-                logger.error(f"SLM API error {response.status_code}: {response.text}")
-                return None
+            
+            # Fallback: return whole response as string
+            result = str(data)
+            logger.warning(f"Unknown response format, returning as string: {len(result)} bytes")
+            self._remember_prompt(prompt_digest)
+            return result
                 
         except requests.Timeout:
             logger.error(f"SLM API timeout after {self.timeout}s")
@@ -88,3 +247,119 @@ class SLMAPIClient:
         except Exception as e:
             logger.error(f"Unexpected error calling SLM API: {e}")
             return None
+    
+    def _remember_prompt(self, prompt_digest: bytes) -> None:
+        """Record a successfully answered prompt, evicting the oldest beyond the window"""
+        self._recent_prompts[prompt_digest] = None
+        self._recent_prompts.move_to_end(prompt_digest)
+        if len(self._recent_prompts) > RECENT_PROMPT_WINDOW:
+            self._recent_prompts.popitem(last=False)
+    
+    @staticmethod
+    def _read_stream(response, stop_at_endmodule: bool) -> str:
+        """
+        Accumulate a streamed response body chunk by chunk
+        
+        Args:
+            response: Streaming requests response
+            stop_at_endmodule: Stop reading (and drop the connection) after 'endmodule'
+            
+        Returns:
+            Response body text received so far
+        """
+        # requests assumes ISO-8859-1 for text/* without a charset, which garbles
+        # UTF-8 model output, so only trust an explicitly declared charset
+        if "charset=" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = "utf-8"
+        
+        buffer = io.StringIO()
+        tail = ""  # End of previous chunk, so a keyword split across chunks is still seen
+        
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True):
+            buffer.write(chunk)
+            
+            if stop_at_endmodule:
+                window = tail + chunk.lower()
+                if "endmodule" in window:
+                    logger.info("Complete module received, closing stream early")
+                    break
+                tail = window[-len("endmodule"):]
+        
+        return buffer.getvalue()
+    
+    def _cache_key(self, prompt: str, temperature: float, stop_at_endmodule: bool) -> str:
+        """
+        Build response cache key from every setting that shapes the response
+        
+        Args:
+            prompt: Full prompt text
+            temperature: Sampling temperature
+            stop_at_endmodule: Whether the body may have been cut after 'endmodule'
+            
+        Returns:
+            Hex digest naming the cache file
+        """
+        # max_length bounds the answer and stop_at_endmodule may truncate it, so
+        # neither kind of response may be replayed to a differently configured call
+        material = f"{self.model}|{self.max_length}|{int(stop_at_endmodule)}|{temperature}|{prompt}"
+        return hashlib.sha256(material.encode()).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+        
+        Args:
+            key: Response cache key
+            
+        Returns:
+            Cached response text or None on miss
+        """
+        path = self.cache_dir / f"{key}.txt"
+        try:
+            text = path.read_text(encoding="utf-8")
+            path.touch()  # Mark as recently used for pruning
+            return text
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read response cache: {e}")
+            return None
+    
+    def _cache_put(self, key: str, text: str) -> None:
+        """
+        Store a response in the cache (write-then-rename so readers never see partial files)
+        
+        Args:
+            key: Response cache key
+            text: Response text
+        """
+        try:
+            tmp_path = self.cache_dir / f"{key}.tmp"
+            tmp_path.write_text(text, encoding="utf-8")
+            tmp_path.replace(self.cache_dir / f"{key}.txt")
+        except Exception as e:
+            logger.warning(f"Could not write response cache: {e}")
+            return
+        
+        self._cache_prune()
+    
+    def _cache_prune(self) -> None:
+        """Delete the least recently used cache entries beyond CACHE_MAX_ENTRIES"""
+        try:
+            entries = []
+            for path in self.cache_dir.glob("*.txt"):
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except FileNotFoundError:
+                    continue  # Pruned concurrently by another run
+            
+            excess = len(entries) - CACHE_MAX_ENTRIES
+            if excess <= 0:
+                return
+            
+            entries.sort()
+            for _, path in entries[:excess]:
+                path.unlink(missing_ok=True)
+            logger.info(f"Pruned {excess} old response cache entries")
+        except Exception as e:
+            logger.warning(f"Could not prune response cache: {e}")
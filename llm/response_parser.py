@@ -7,6 +7,20 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns (compiled once at import, reused on every parse)
+_LEADING_REASONING_RE = re.compile(
+    r'^.*?(?=^\s*module\s+\w+\s*[\(#])',  # Everything before first proper module declaration
+    re.DOTALL | re.MULTILINE | re.IGNORECASE
+)
+_MARKDOWN_RE_VERILOG = re.compile(r'```(?:verilog|systemverilog|sv)\s*\n(.*?)\n```', re.DOTALL | re.IGNORECASE)
+_MARKDOWN_RE_GENERIC = re.compile(r'```\s*\n(.*?)\n```', re.DOTALL | re.IGNORECASE)
+_MODULE_KEYWORD_RE = re.compile(r'\bmodule\s', re.IGNORECASE)
+_MODULE_BLOCK_RE = re.compile(
+    r'^\s*module\s+\w+\s*[\(#].*?endmodule\s*$',
+    re.DOTALL | re.MULTILINE | re.IGNORECASE
+)
+_MODULE_NAME_RE = re.compile(r'module\s+(\w+)', re.IGNORECASE)
+
 
 class ResponseParser:
     """Extract and validate Verilog code from SLM responses"""
@@ -24,13 +38,7 @@ class ResponseParser:
         """
         # Remove leading thinking/reasoning sections before first proper module
         # This handles cases like "Okay, let me think..." before the actual code
-        patterns_to_remove = [
-            r'^.*?(?=^\s*module\s+\w+\s*[\(#])',  # Remove everything before first proper module declaration
-        ]
-        
-        cleaned = response
-        for pattern in patterns_to_remove:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.DOTALL | re.MULTILINE | re.IGNORECASE)
+        cleaned = _LEADING_REASONING_RE.sub('', response)
         
         # If pattern didn't match (no proper module found), return original
         if cleaned.strip():
@@ -60,28 +68,20 @@ class ResponseParser:
         # Pre-process to remove reasoning text
         response = ResponseParser._remove_reasoning_text(response)
         
-        # Strategy 1: Markdown code blocks
-        markdown_patterns = [
-            r'```(?:verilog|systemverilog|sv)\s*\n(.*?)\n```',
-            r'```\s*\n(.*?)\n```',
-        ]
-        
-        for pattern in markdown_patterns:
-            match = re.search(pattern, response, re.DOTALL | re.IGNORECASE)
-            if match:
-                code = match.group(1).strip()
-                logger.info(f"Extracted from markdown block: {len(code)} bytes")
-                return code
+        # Strategy 1: Markdown code blocks (skip both regex scans when there is no fence)
+        if '```' in response:
+            for pattern in (_MARKDOWN_RE_VERILOG, _MARKDOWN_RE_GENERIC):
+                match = pattern.search(response)
+                if match:
+                    code = match.group(1).strip()
+                    logger.info(f"Extracted from markdown block: {len(code)} bytes")
+                    return code
         
         # Strategy 2: Module boundaries - require proper module declaration syntax
-        if 'module ' in response.lower():
+        if _MODULE_KEYWORD_RE.search(response):
             # Match proper module declaration: module <name> followed by ( or #
             # This prevents matching "the module" or "module has to" in reasoning text
-            match = re.search(
-                r'^\s*module\s+\w+\s*[\(#].*?endmodule\s*$',
-                response,
-                re.DOTALL | re.MULTILINE | re.IGNORECASE
-            )
+            match = _MODULE_BLOCK_RE.search(response)
             if match:
                 code = match.group(0).strip()
                 logger.info(f"Extracted module definition: {len(code)} bytes")
@@ -102,7 +102,7 @@ class ResponseParser:
         Returns:
             Module name or None if not found
         """
-        match = re.search(r'module\s+(\w+)', code, re.IGNORECASE)
+        match = _MODULE_NAME_RE.search(code)
         if match:
             module_name = match.group(1)
             logger.info(f"Module name: {module_name}")
@@ -126,14 +126,16 @@ class ResponseParser:
             logger.warning("Empty code provided for validation")
             return False
         
-        # Check for module keyword
-        if 'module' not in code.lower():
-            logger.warning("No 'module' keyword found")
-            return False
+        # Lowercase once and reuse for both keyword checks
+        code_lower = code.lower()
         
-        # Check for endmodule keyword
-        if 'endmodule' not in code.lower():
-            logger.warning("No 'endmodule' keyword found")
+        # Check for module/endmodule keywords ('endmodule' contains 'module',
+        # so valid code needs only one scan)
+        if 'endmodule' not in code_lower:
+            if 'module' not in code_lower:
+                logger.warning("No 'module' keyword found")
+            else:
+                logger.warning("No 'endmodule' keyword found")
             return False
         
         # Check balanced parentheses
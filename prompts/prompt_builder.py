@@ -1,12 +1,98 @@
 #!/usr/bin/env python3
 """Build optimized prompts for SLM code generation"""
 
+import io
+import re
 import logging
-from typing import Dict, List
+from typing import Dict, List, FrozenSet, NamedTuple, Optional
 from prompts.templates import *
 
 logger = logging.getLogger(__name__)
 
+# Few-shot example triggers: (task keywords, example key), in output order
+_EXAMPLE_TRIGGERS = (
+    (("counter", "count"), "counter"),
+    (("fifo", "buffer", "queue"), "fifo"),
+    (("fsm", "state", "machine"), "fsm"),
+)
+_DEFAULT_EXAMPLE = "counter"
+
+# All trigger keywords fused into one alternation with a named group per example
+_EXAMPLE_SELECTOR_RE = re.compile(
+    "|".join(
+        f"(?P<{key}>{'|'.join(re.escape(kw) for kw in keywords)})"
+        for keywords, key in _EXAMPLE_TRIGGERS
+    ),
+    re.IGNORECASE
+)
+
+# Context file priority order: docs > rtl > verif (other directories are skipped)
+CONTEXT_PRIORITY = ("docs/", "rtl/", "verif/")
+
+# Error text budget for refinement prompts; longer logs keep their head (first
+# lint errors) and tail (test summary) and drop the middle
+MAX_ERROR_CHARS = 4000
+ERROR_TRUNCATION_MARKER = "\n... (truncated)\n"
+
+
+def _format_examples(example_keys: FrozenSet[str]) -> str:
+    """
+    Build the few-shot examples block for a set of example keys
+    
+    Args:
+        example_keys: Keys into FEW_SHOT_EXAMPLES matched by the task
+        
+    Returns:
+        Formatted examples string
+    """
+    selected = [FEW_SHOT_EXAMPLES[key] for _, key in _EXAMPLE_TRIGGERS if key in example_keys]
+    
+    # Default: include counter example if no specific match
+    if not selected:
+        selected.append(FEW_SHOT_EXAMPLES[_DEFAULT_EXAMPLE])
+    
+    return "\nDESIGN PATTERNS:\n" + "\n".join(selected)
+
+
+class BuiltPrompt(NamedTuple):
+    """A built prompt, its static leading part and its repeat-detection key"""
+    text: str        # Full prompt to send to the SLM
+    prefix: str      # Invariant leading part of text (role, rules, examples)
+    repeat_key: str  # text without per-iteration markers, for repeat detection
+
+
+def _truncate_errors(errors: str) -> str:
+    """
+    Bound error text to MAX_ERROR_CHARS, cutting the middle on line boundaries
+    
+    Args:
+        errors: Error messages from tests
+        
+    Returns:
+        Error text that fits the budget
+    """
+    if len(errors) <= MAX_ERROR_CHARS:
+        return errors
+    
+    half = MAX_ERROR_CHARS // 2
+    
+    # Snap cut points to line boundaries where possible
+    head_end = errors.rfind("\n", 0, half)
+    if head_end <= 0:
+        head_end = half
+    tail_start = errors.find("\n", len(errors) - half)
+    if tail_start == -1:
+        tail_start = len(errors) - half
+    else:
+        tail_start += 1
+    
+    return errors[:head_end] + ERROR_TRUNCATION_MARKER + errors[tail_start:]
+
+
+# Prefixes that depend only on SYSTEM_PROMPT are formatted once at import
+_REFINEMENT_PREFIX_TEXT = REFINEMENT_PREFIX.format(system_prompt=SYSTEM_PROMPT)
+_PORT_USAGE_PREFIX_TEXT = PORT_USAGE_PREFIX.format(system_prompt=SYSTEM_PROMPT)
+
 
 class PromptBuilder:
     """Construct optimized prompts for SLM code generation"""
@@ -29,12 +115,16 @@ class PromptBuilder:
         input_tokens = int(slm_max_tokens * 0.75)  # 75% for input (system, task, examples, context)
         self.max_prompt_chars = input_tokens * 4    # Convert tokens to chars
         
+        # Formatted initial-prompt prefixes keyed by few-shot example signature
+        # (None when few-shot examples are disabled)
+        self._prefix_by_keyset: Dict[Optional[FrozenSet[str]], str] = {}
+        
         logger.info(f"Initialized PromptBuilder (few_shot={use_few_shot}, max_files={max_context_files})")
         logger.info(f"  SLM max tokens: {slm_max_tokens}")
         logger.info(f"  Input budget: 75% = {input_tokens} tokens (~{self.max_prompt_chars} chars)")
         logger.info(f"  Output reserve: 25% = {slm_max_tokens - input_tokens} tokens")
     
-    def build_initial_prompt(self, task: str, context: Dict[str, str]) -> str:
+    def build_initial_prompt(self, task: str, context: Dict[str, str]) -> BuiltPrompt:
         """
         Build initial code generation prompt
         
@@ -43,25 +133,31 @@ class PromptBuilder:
             context: Dictionary of file_path -> content
             
         Returns:
-            Formatted prompt string
+            BuiltPrompt with the formatted prompt, its static prefix and repeat key
         """
         # Format context files (prioritized)
         context_str = self._format_context(context)
         
-        # Select relevant few-shot examples
-        examples_str = ""
-        if self.use_few_shot:
-            examples_str = self._select_examples(task)
+        # Reuse the formatted prefix for this few-shot example selection
+        keyset = self._classify(task) if self.use_few_shot else None
+        prefix = self._prefix_by_keyset.get(keyset)
+        if prefix is None:
+            examples_str = self._select_examples(keyset) if self.use_few_shot else ""
+            prefix = INITIAL_GENERATION_PREFIX.format(
+                system_prompt=SYSTEM_PROMPT,
+                few_shot_examples=examples_str
+            )
+            self._prefix_by_keyset[keyset] = prefix
         
-        prompt = INITIAL_GENERATION_TEMPLATE.format(
-            system_prompt=SYSTEM_PROMPT,
+        suffix = INITIAL_GENERATION_SUFFIX.format(
             task_description=task,
-            context_files=context_str,
-            few_shot_examples=examples_str
+            context_files=context_str
         )
         
-        logger.info(f"Built initial prompt: {len(prompt)} chars")
-        return prompt
+        prompt = "".join((prefix, suffix))
+        
+        logger.info(f"Built initial prompt: {len(prompt)} chars ({len(prefix)} static prefix)")
+        return BuiltPrompt(prompt, prefix, prompt)
     
     def build_refinement_prompt(
         self,
@@ -70,7 +166,7 @@ class PromptBuilder:
         errors: str,
         error_category: str,
         iteration: int
-    ) -> str:
+    ) -> BuiltPrompt:
         """
         Build error-driven refinement prompt
         
@@ -82,26 +178,32 @@ class PromptBuilder:
             iteration: Current iteration number
             
         Returns:
-            Formatted refinement prompt
+            BuiltPrompt with the formatted refinement prompt, its static prefix and repeat key
         """
-        prompt = REFINEMENT_TEMPLATE.format(
-            system_prompt=SYSTEM_PROMPT,
-            task_description=task,
-            previous_code=previous_code,
-            error_messages=errors,
-            error_category=error_category,
-            iteration=iteration
-        )
+        prefix = _REFINEMENT_PREFIX_TEXT
+        fields = {
+            "task_description": task,
+            "previous_code": previous_code,
+            "error_messages": _truncate_errors(errors),
+            "error_category": error_category,
+        }
+        suffix = REFINEMENT_SUFFIX.format(iteration=iteration, **fields)
         
-        logger.info(f"Built refinement prompt: {len(prompt)} chars")
-        return prompt
+        prompt = "".join((prefix, suffix))
+        
+        # The iteration number differs on every call, so leave it out of the key
+        # or identical code and errors would never be seen as a repeat
+        repeat_key = "".join((prefix, REFINEMENT_SUFFIX.format(iteration="", **fields)))
+        
+        logger.info(f"Built refinement prompt: {len(prompt)} chars ({len(prefix)} static prefix)")
+        return BuiltPrompt(prompt, prefix, repeat_key)
     
     def build_port_usage_prompt(
         self,
         current_code: str,
         unused_inputs: List[str],
         unused_outputs: List[str]
-    ) -> str:
+    ) -> BuiltPrompt:
         """
         Build port usage refinement prompt (NEW)
         
@@ -111,22 +213,24 @@ class PromptBuilder:
             unused_outputs: List of unused output port names
             
         Returns:
-            Formatted port usage prompt
+            BuiltPrompt with the formatted port usage prompt, its static prefix and repeat key
         """
         unused_inputs_str = ", ".join(unused_inputs) if unused_inputs else "None"
         unused_outputs_str = ", ".join(unused_outputs) if unused_outputs else "None"
         
-        prompt = PORT_USAGE_TEMPLATE.format(
-            system_prompt=SYSTEM_PROMPT,
+        prefix = _PORT_USAGE_PREFIX_TEXT
+        suffix = PORT_USAGE_SUFFIX.format(
             current_code=current_code,
             unused_inputs=unused_inputs_str,
             unused_outputs=unused_outputs_str
         )
         
-        logger.info(f"Built port usage prompt: {len(prompt)} chars")
+        prompt = "".join((prefix, suffix))
+        
+        logger.info(f"Built port usage prompt: {len(prompt)} chars ({len(prefix)} static prefix)")
         logger.info(f"  Unused inputs: {unused_inputs_str}")
         logger.info(f"  Unused outputs: {unused_outputs_str}")
-        return prompt
+        return BuiltPrompt(prompt, prefix, prompt)
     
     def _format_context(self, context: Dict[str, str]) -> str:
         """
@@ -138,63 +242,72 @@ class PromptBuilder:
         Returns:
             Formatted context string
         """
-        lines = []
         file_count = 0
         total_context_chars = 0
         
         # Calculate per-file budget: divide available chars by max files
         chars_per_file = self.max_prompt_chars // max(self.max_context_files, 1)
         
-        # Priority order: docs > rtl > verif
-        priority_order = ["docs/", "rtl/", "verif/"]
-        
-        for prefix in priority_order:
-            for file_path, content in context.items():
-                if file_path.startswith(prefix) and file_count < self.max_context_files:
-                    # Truncate large files to per-file budget
-                    truncated_content = content[:chars_per_file]
-                    if len(content) > chars_per_file:
-                        truncated_content += "\n... (truncated)"
-                    
-                    file_section = f"\nFILE: {file_path}\n```\n{truncated_content}\n```"
-                    lines.append(file_section)
-                    total_context_chars += len(file_section)
-                    file_count += 1
-        
-        if not lines:
+        # Rank files once by (priority, path) instead of rescanning the dict per prefix
+        ranked = []
+        for file_path in context:
+            for rank, prefix in enumerate(CONTEXT_PRIORITY):
+                if file_path.startswith(prefix):
+                    ranked.append((rank, file_path))
+                    break
+        ranked.sort()
+        
+        buffer = io.StringIO()
+        for _, file_path in ranked[:self.max_context_files]:
+            content = context[file_path]
+            
+            # Truncate large files to per-file budget
+            truncated_content = content[:chars_per_file]
+            if len(content) > chars_per_file:
+                truncated_content += "\n... (truncated)"
+            
+            file_section = f"\nFILE: {file_path}\n```\n{truncated_content}\n```"
+            if file_count:
+                buffer.write("\n")
+            buffer.write(file_section)
+            total_context_chars += len(file_section)
+            file_count += 1
+        
+        if not file_count:
             return "No context files available"
         
         logger.info(f"Formatted {file_count} context files")
         logger.info(f"  Total context chars: {total_context_chars}")
         logger.info(f"  Per-file budget: {chars_per_file} chars")
-        return "\n".join(lines)
+        return buffer.getvalue()
     
-    def _select_examples(self, task: str) -> str:
+    def _select_examples(self, keyset: FrozenSet[str]) -> str:
         """
-        Select relevant few-shot examples based on task keywords
+        Select relevant few-shot examples for a task's example signature
         
         Args:
-            task: Task description
+            keyset: Example keys matched by the task (from _classify)
             
         Returns:
             Formatted examples string
         """
-        task_lower = task.lower()
-        selected = []
-        
-        # Keyword matching for example selection
-        if any(kw in task_lower for kw in ["counter", "count"]):
-            selected.append(FEW_SHOT_EXAMPLES["counter"])
-        
-        if any(kw in task_lower for kw in ["fifo", "buffer", "queue"]):
-            selected.append(FEW_SHOT_EXAMPLES["fifo"])
-        
-        if any(kw in task_lower for kw in ["fsm", "state", "machine"]):
-            selected.append(FEW_SHOT_EXAMPLES["fsm"])
-        
-        # Default: include counter example if no specific match
-        if not selected:
-            selected.append(FEW_SHOT_EXAMPLES["counter"])
+        logger.info(f"Selected {len(keyset) or 1} few-shot examples")
+        return _format_examples(keyset)
+    
+    def _classify(self, task: str) -> FrozenSet[str]:
+        """
+        Compute the few-shot example signature of a task
         
-        logger.info(f"Selected {len(selected)} few-shot examples")
-        return "\nDESIGN PATTERNS:\n" + "\n".join(selected)
+        Args:
+            task: Task description
+            
+        Returns:
+            Frozenset of example keys whose keywords appear in the task
+        """
+        # Single pass over the task instead of one substring scan per keyword
+        matched = set()
+        for match in _EXAMPLE_SELECTOR_RE.finditer(task):
+            matched.add(match.lastgroup)
+            if len(matched) == len(_EXAMPLE_TRIGGERS):  # Every example already selected
+                break
+        return frozenset(matched)
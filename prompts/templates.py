@@ -133,17 +133,14 @@ endmodule
 }
 
 
+# Templates are split into a static PREFIX (role, rules, examples) and a
+# dynamic SUFFIX (task, code, errors). Keeping invariant text strictly in
+# front lets the SLM server reuse its KV cache for the shared prefix.
+
 # Initial generation template
-INITIAL_GENERATION_TEMPLATE = """{system_prompt}
+INITIAL_GENERATION_PREFIX = """{system_prompt}
 
 TASK: Generate Verilog/SystemVerilog RTL code
-
-REQUIREMENTS:
-{task_description}
-
-CONTEXT FILES:
-{context_files}
-
 {few_shot_examples}
 
 OUTPUT FORMAT:
@@ -166,16 +163,41 @@ module <name> (
     // port declarations
 );
     // internal logic
-endmodule
+endmodule"""
+
+INITIAL_GENERATION_SUFFIX = """
+
+CONTEXT FILES:
+{context_files}
+
+REQUIREMENTS:
+{task_description}
 
 GENERATE THE MODULE CODE NOW:"""
 
+INITIAL_GENERATION_TEMPLATE = INITIAL_GENERATION_PREFIX + INITIAL_GENERATION_SUFFIX
+
 
 # Refinement template for syntax/compilation errors
-REFINEMENT_TEMPLATE = """{system_prompt}
+REFINEMENT_PREFIX = """{system_prompt}
 
 TASK: Fix compilation/test errors in Verilog code
 
+INSTRUCTIONS:
+- ANALYZE: Identify root cause of each error
+- FIX: Correct the specific errors listed below
+- PRESERVE: Keep working parts unchanged
+- VERIFY: Ensure all fixes are complete
+- OUTPUT: Full corrected code (not diff/patch)
+
+CRITICAL INSTRUCTIONS:
+- Output ONLY the corrected Verilog module code
+- Do NOT include explanations or reasoning text
+- Start your response immediately with "module"
+- Do NOT write analysis or thinking steps before the code"""
+
+REFINEMENT_SUFFIX = """
+
 ORIGINAL REQUIREMENTS:
 {task_description}
 
@@ -191,36 +213,16 @@ ERRORS DETECTED:
 
 ERROR CATEGORY: {error_category}
 
-INSTRUCTIONS:
-- ANALYZE: Identify root cause of each error
-- FIX: Correct the specific errors listed above
-- PRESERVE: Keep working parts unchanged
-- VERIFY: Ensure all fixes are complete
-- OUTPUT: Full corrected code (not diff/patch)
-
-CRITICAL INSTRUCTIONS:
-- Output ONLY the corrected Verilog module code
-- Do NOT include explanations or reasoning text
-- Start your response immediately with "module"
-- Do NOT write analysis or thinking steps before the code
-
 GENERATE THE FIXED MODULE CODE NOW:"""
 
+REFINEMENT_TEMPLATE = REFINEMENT_PREFIX + REFINEMENT_SUFFIX
+
 
 # Port usage refinement template (NEW)
-PORT_USAGE_TEMPLATE = """{system_prompt}
+PORT_USAGE_PREFIX = """{system_prompt}
 
 TASK: Complete port usage in Verilog module
 
-CURRENT CODE (compiles but incomplete):
-```verilog
-{current_code}
-```
-
-PORT USAGE ANALYSIS:
-- UNUSED INPUT PORTS: {unused_inputs}
-- UNUSED OUTPUT PORTS: {unused_outputs}
-
 REQUIREMENTS:
 - MUST use all input ports in internal logic
 - MUST assign all output ports
@@ -234,6 +236,19 @@ CONSTRAINTS:
 
 GUIDANCE:
 - Unused inputs: Use in conditional logic, counters, or state machines
-- Unused outputs: Assign based on inputs or internal state
+- Unused outputs: Assign based on inputs or internal state"""
+
+PORT_USAGE_SUFFIX = """
+
+CURRENT CODE (compiles but incomplete):
+```verilog
+{current_code}
+```
+
+PORT USAGE ANALYSIS:
+- UNUSED INPUT PORTS: {unused_inputs}
+- UNUSED OUTPUT PORTS: {unused_outputs}
 
 GENERATE: Complete RTL code with all ports properly used"""
+
+PORT_USAGE_TEMPLATE = PORT_USAGE_PREFIX + PORT_USAGE_SUFFIX
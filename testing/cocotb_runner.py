@@ -7,6 +7,31 @@ from typing import Tuple
 
 logger = logging.getLogger(__name__)
 
+# Only the last lines of test output are kept for the refinement prompt
+MAX_OUTPUT_LINES = 50
+
+
+def _tail_lines(text: str, count: int) -> str:
+    """
+    Return the last `count` lines of text without splitting the whole string
+    
+    Equivalent to "\n".join(text.split("\n")[-count:]) but only walks
+    backwards over the tail that is kept.
+    
+    Args:
+        text: Full output text
+        count: Number of trailing lines to keep
+        
+    Returns:
+        Trailing lines of text
+    """
+    pos = len(text)
+    for _ in range(count):
+        pos = text.rfind("\n", 0, pos)
+        if pos == -1:
+            return text
+    return text[pos + 1:]
+
 
 class CocotbRunner:
     """Run CocoTB-based tests if available"""
@@ -49,9 +74,8 @@ class CocotbRunner:
                 return True, ""
             else:
                 logger.warning(f"CocoTB tests FAILED (exit code: {result.returncode})")
-                # Extract relevant errors (last 50 lines)
-                error_lines = output.split("\n")[-50:]
-                errors = "\n".join(error_lines)
+                # Extract relevant errors (last lines)
+                errors = _tail_lines(output, MAX_OUTPUT_LINES)
                 return False, errors
                 
         except subprocess.TimeoutExpired:
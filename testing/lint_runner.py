@@ -1,13 +1,40 @@
 #!/usr/bin/env python3
 """Run Verilator and Icarus Verilog lint checks"""
 
-import subprocess
+import os
+import codecs
+import signal
+import asyncio
 import logging
 from pathlib import Path
 from typing import Tuple, List
 
 logger = logging.getLogger(__name__)
 
+# Only the first lines of lint output are kept for the refinement prompt
+MAX_OUTPUT_LINES = 50
+
+# Output is read in fixed-size chunks (a line-based read fails on lines over
+# the StreamReader limit); kept lines are capped at MAX_LINE_CHARS
+READ_CHUNK_SIZE = 65536
+MAX_LINE_CHARS = 65536
+
+
+def _kill_process_group(proc) -> None:
+    """
+    Kill a lint process and every child in its process group
+    
+    Killing only the parent would leave children holding the stdout pipe
+    open, and waiting on the process would block until they exit.
+    
+    Args:
+        proc: asyncio subprocess started with start_new_session=True
+    """
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass  # Already exited
+
 
 class LintRunner:
     """Run HDL lint checks using Verilator or Icarus Verilog"""
@@ -37,81 +64,150 @@ class LintRunner:
         
         logger.info(f"Linting {len(rtl_files)} RTL files...")
         
-        # Try Verilator first
-        success, errors = self._run_verilator(rtl_files)
+        return asyncio.run(self.run_async(rtl_files))
+    
+    async def run_async(self, rtl_files: List[Path]) -> Tuple[bool, str]:
+        """
+        Run Verilator and Icarus Verilog concurrently
+        
+        Verilator's verdict wins whenever Verilator is available; Icarus is
+        started alongside it so the fallback result is ready without waiting
+        for Verilator first, and is cancelled once Verilator has answered.
+        
+        Args:
+            rtl_files: List of RTL file paths
+            
+        Returns:
+            Tuple of (success, error_messages)
+        """
+        verilator_task = asyncio.create_task(self._run_verilator(rtl_files))
+        icarus_task = asyncio.create_task(self._run_icarus(rtl_files))
+        
+        success, errors = await verilator_task
         if success or errors:  # If verilator worked (even with errors)
+            icarus_task.cancel()
+            try:
+                await icarus_task
+            except asyncio.CancelledError:
+                pass
             return success, errors
         
         # Fallback to Icarus Verilog
-        logger.info("Verilator not available, trying Icarus Verilog...")
-        return self._run_icarus(rtl_files)
+        logger.info("Verilator not available, using Icarus Verilog...")
+        return await icarus_task
     
-    def _run_verilator(self, rtl_files: List[Path]) -> Tuple[bool, str]:
+    async def _exec(self, cmd: List[str]) -> Tuple[int, str, bool]:
+        """
+        Run a lint command, streaming its output with a bounded line buffer
+        
+        Only the first MAX_OUTPUT_LINES lines are kept; the rest is drained
+        (so the tool never blocks on a full pipe and its exit code stays
+        accurate) but not stored. The process group is killed if reading is
+        interrupted for any reason (timeout, cancellation or error).
+        
+        Args:
+            cmd: Command line to execute
+            
+        Returns:
+            Tuple of (return_code, first output lines, whether "error" appeared anywhere)
+        """
+        # Own session/process group, so the tool and any children it spawns
+        # (iverilog runs ivlpp/ivl) can be killed together
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True
+        )
+        
+        head_lines = []
+        error_seen = False
+        
+        async def drain() -> int:
+            nonlocal error_seen
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            partial = ""  # Unterminated last line, kept while the head has room
+            tail = ""     # End of previous chunk, so "error" split across chunks is seen
+            
+            while True:
+                data = await proc.stdout.read(READ_CHUNK_SIZE)
+                text = decoder.decode(data, final=not data)
+                
+                if not error_seen and text:
+                    window = tail + text.lower()
+                    error_seen = "error" in window
+                    tail = window[-len("error"):]
+                
+                if len(head_lines) < MAX_OUTPUT_LINES:
+                    *complete, partial = (partial + text).split("\n")
+                    for line in complete[:MAX_OUTPUT_LINES - len(head_lines)]:
+                        head_lines.append(line[:MAX_LINE_CHARS] + "\n")
+                    partial = partial[:MAX_LINE_CHARS]
+                
+                if not data:
+                    break
+            
+            if partial and len(head_lines) < MAX_OUTPUT_LINES:
+                head_lines.append(partial)
+            return await proc.wait()
+        
+        try:
+            returncode = await asyncio.wait_for(drain(), timeout=self.timeout)
+        finally:
+            # Never leave the tool running, whatever interrupted the read
+            if proc.returncode is None:
+                _kill_process_group(proc)
+                await proc.wait()
+        
+        return returncode, "".join(head_lines), error_seen
+    
+    async def _run_verilator(self, rtl_files: List[Path]) -> Tuple[bool, str]:
         """Run Verilator lint checks"""
         try:
             cmd = ["verilator", "--lint-only", "-Wall"] + [str(f) for f in rtl_files]
             
             logger.info(f"Running: {' '.join(cmd)}")
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
-            )
+            returncode, errors, _ = await self._exec(cmd)
             
-            output = result.stderr + result.stdout
-            
-            if result.returncode == 0:
+            if returncode == 0:
                 logger.info("Verilator lint checks PASSED")
                 return True, ""
             else:
                 logger.warning("Verilator lint checks FAILED")
-                # Extract first 50 lines of errors
-                error_lines = output.split("\n")[:50]
-                errors = "\n".join(error_lines)
                 return False, errors
                 
         except FileNotFoundError:
             logger.info("Verilator not found")
             return False, ""
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.error(f"Verilator timeout after {self.timeout}s")
             return False, f"Lint timeout after {self.timeout}s"
         except Exception as e:
             logger.warning(f"Verilator error: {e}")
             return False, ""
     
-    def _run_icarus(self, rtl_files: List[Path]) -> Tuple[bool, str]:
+    async def _run_icarus(self, rtl_files: List[Path]) -> Tuple[bool, str]:
         """Run Icarus Verilog lint checks"""
         try:
             cmd = ["iverilog", "-tnull", "-Wall"] + [str(f) for f in rtl_files]
             
             logger.info(f"Running: {' '.join(cmd)}")
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
-            )
-            
-            output = result.stderr + result.stdout
+            returncode, errors, error_seen = await self._exec(cmd)
             
             # Icarus returns 0 even with warnings, check for "error" in output
-            if result.returncode == 0 and "error" not in output.lower():
+            if returncode == 0 and not error_seen:
                 logger.info("Icarus Verilog checks PASSED")
                 return True, ""
             else:
                 logger.warning("Icarus Verilog checks FAILED")
-                error_lines = output.split("\n")[:50]
-                errors = "\n".join(error_lines)
                 return False, errors
                 
         except FileNotFoundError:
             logger.error("Icarus Verilog not found")
             return False, "No suitable lint tool available (tried Verilator and Icarus)"
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.error(f"Icarus timeout after {self.timeout}s")
             return False, f"Lint timeout after {self.timeout}s"
         except Exception as e:
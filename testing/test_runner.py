@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """Orchestrate test execution (CocoTB and lint checks)"""
 
+import os
+import re
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, List
 from testing.cocotb_runner import CocotbRunner
@@ -9,6 +12,85 @@ from testing.lint_runner import LintRunner
 
 logger = logging.getLogger(__name__)
 
+# Error categories in priority order: the first category in this list with
+# any keyword present in the error text wins
+ERROR_CATEGORIES = (
+    ("syntax", ("syntax error", "parse error", "unexpected", "expected")),
+    ("undeclared", ("undeclared", "undefined", "not declared")),
+    ("type", ("type mismatch", "incompatible types")),
+    ("width", ("width", "bit width", "size mismatch")),
+    ("latch", ("latch",)),
+    ("timing", ("timing", "setup", "hold")),
+)
+
+# All keywords fused into one alternation (one named group per category) so
+# the error text is scanned once instead of once per keyword list
+_CATEGORY_RE = re.compile(
+    "|".join(
+        f"(?P<{category}>{'|'.join(re.escape(kw) for kw in keywords)})"
+        for category, keywords in ERROR_CATEGORIES
+    ),
+    re.IGNORECASE
+)
+_CATEGORY_RANK = {category: rank for rank, (category, _) in enumerate(ERROR_CATEGORIES)}
+
+RTL_SUFFIXES = (".v", ".sv")
+
+
+@lru_cache(maxsize=1)
+def _scan_rtl_dir(rtl_dir: str, mtime_ns: int) -> Tuple[Path, ...]:
+    """
+    List RTL files in a directory with a single scandir pass
+    
+    Cached on the directory mtime, which changes whenever a file is
+    added, removed or renamed.
+    
+    Args:
+        rtl_dir: RTL directory path
+        mtime_ns: Directory modification time (cache key only)
+        
+    Returns:
+        Tuple of RTL file paths, all .v files before all .sv files
+    """
+    with os.scandir(rtl_dir) as entries:
+        rtl_files = [
+            Path(entry.path) for entry in entries
+            if entry.name.endswith(RTL_SUFFIXES) and entry.is_file()
+        ]
+    
+    # Stable sort keeps directory order within each suffix; file order on the
+    # lint command line matters for packages
+    rtl_files.sort(key=lambda path: RTL_SUFFIXES.index(path.suffix))
+    return tuple(rtl_files)
+
+
+@lru_cache(maxsize=64)
+def _categorize(errors: str) -> str:
+    """
+    Categorize error text by the highest-priority keyword present (memoized)
+    
+    Identical test output recurs when the SLM regenerates the same code, so
+    results are cached on the error text itself.
+    
+    Args:
+        errors: Error messages from tests
+        
+    Returns:
+        Error category, or "general" if no keyword matches
+    """
+    best_rank = None
+    
+    for match in _CATEGORY_RE.finditer(errors):
+        rank = _CATEGORY_RANK[match.lastgroup]
+        if best_rank is None or rank < best_rank:
+            best_rank = rank
+            if rank == 0:  # Highest priority, nothing can beat it
+                break
+    
+    if best_rank is None:
+        return "general"
+    return ERROR_CATEGORIES[best_rank][0]
+
 
 class TestRunner:
     """Orchestrate test execution"""
@@ -61,17 +143,15 @@ class TestRunner:
     
     def _find_rtl_files(self) -> List[Path]:
         """Find all RTL files for linting"""
-        rtl_files = []
-        rtl_dir = Path("/code/rtl")
+        rtl_dir = "/code/rtl"
         
-        if not rtl_dir.exists():
-            return rtl_files
+        try:
+            mtime_ns = os.stat(rtl_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
         
         # Find .v and .sv files
-        rtl_files.extend(rtl_dir.glob("*.v"))
-        rtl_files.extend(rtl_dir.glob("*.sv"))
-        
-        return list(rtl_files)
+        return list(_scan_rtl_dir(rtl_dir, mtime_ns))
     
     def categorize_errors(self, errors: str) -> str:
         """
@@ -83,31 +163,4 @@ class TestRunner:
         Returns:
             Error category (syntax, logic, timing, etc.)
         """
-        errors_lower = errors.lower()
-        
-        # Syntax errors
-        if any(kw in errors_lower for kw in ["syntax error", "parse error", "unexpected", "expected"]):
-            return "syntax"
-        
-        # Undefined/undeclared
-        if any(kw in errors_lower for kw in ["undeclared", "undefined", "not declared"]):
-            return "undeclared"
-        
-        # Type errors
-        if any(kw in errors_lower for kw in ["type mismatch", "incompatible types"]):
-            return "type"
-        
-        # Width mismatches
-        if any(kw in errors_lower for kw in ["width", "bit width", "size mismatch"]):
-            return "width"
-        
-        # Latch inference
-        if "latch" in errors_lower:
-            return "latch"
-        
-        # Timing
-        if any(kw in errors_lower for kw in ["timing", "setup", "hold"]):
-            return "timing"
-        
-        # Default
-        return "general"
+        return _categorize(errors)
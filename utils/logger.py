@@ -3,7 +3,6 @@
 
 import sys
 import logging
-from typing import Optional
 
 
 class TeeLogger: